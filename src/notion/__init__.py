@@ -1,21 +1,41 @@
 """Notion API integrations using notion-sdk-py"""
+import atexit
+import importlib.util
+import logging
 import os
+from functools import cached_property
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, TypedDict, TypeVar
+from types import MappingProxyType
+from typing import Any, Dict, List, Optional, Tuple, TypeVar
 
-from auto_gpt_plugin_template import AutoGPTPluginTemplate
+import httpx
+from auto_gpt_plugin_template import AutoGPTPluginTemplate, Message
 from dotenv import load_dotenv
 from notion_client import Client
 
 PromptGenerator = TypeVar("PromptGenerator")
 
-with open(str(Path(os.getcwd()) / ".env"), "r") as fp:
-    load_dotenv(stream=fp)
+logger = logging.getLogger(__name__)
 
 
-class Message(TypedDict):
-    role: str
-    content: str
+def _load_env() -> None:
+    """Load the working directory's .env unless the variables are already set."""
+    if "NOTION_TOKEN" in os.environ and "NOTION_DATABASE_ID" in os.environ:
+        return
+    dotenv_path = Path.cwd() / ".env"
+    if dotenv_path.is_file():
+        load_dotenv(dotenv_path=dotenv_path, override=False)
+
+
+def _handles(self, *args, **kwargs) -> bool:
+    """Shared ``can_handle_*`` implementation for hooks this plugin uses,
+    unless it was disabled for lack of configuration."""
+    return not self._disabled
+
+
+def _ignores(self, *args, **kwargs) -> bool:
+    """Shared ``can_handle_*`` implementation for hooks this plugin skips."""
+    return False
 
 
 class AutoGPTNotion(AutoGPTPluginTemplate):
@@ -28,29 +48,52 @@ class AutoGPTNotion(AutoGPTPluginTemplate):
         self._name = "autogpt-notion"
         self._version = "0.1.0"
         self._description = "Notion API integrations using notion-sdk-py"
-        self.notion_token = os.getenv("NOTION_TOKEN")
-        self.database_id = os.getenv("NOTION_DATABASE_ID")
-        self.notion = Client(auth=self.notion_token)
-
-    def can_handle_on_response(self) -> bool:
-        """This method is called to check that the plugin can
-        handle the on_response method.
+        # Without credentials every command would fail, so skip the plugin
+        # and never build the Notion client
+        self._disabled = not (self.notion_token and self.database_id)
+        if self._disabled:
+            logger.warning(
+                "NOTION_TOKEN or NOTION_DATABASE_ID is not set, "
+                "the Notion plugin is disabled"
+            )
+
+    @cached_property
+    def notion_token(self) -> Optional[str]:
+        _load_env()
+        return os.getenv("NOTION_TOKEN")
+
+    @cached_property
+    def database_id(self) -> Optional[str]:
+        _load_env()
+        return os.getenv("NOTION_DATABASE_ID")
+
+    @cached_property
+    def notion(self) -> Client:
+        """The Notion client, built on the first Notion command rather than at
+        plugin load so Auto-GPT startup doesn't pay for it."""
+        # Share one keep-alive connection pool across all Notion commands so
+        # the TLS handshake with api.notion.com is paid once, not per call.
+        # HTTP/2 lets concurrent calls share that connection; it needs the
+        # optional h2 package, otherwise httpx sticks to HTTP/1.1.
+        self._http = httpx.Client(
+            http2=importlib.util.find_spec("h2") is not None,
+            limits=httpx.Limits(
+                max_keepalive_connections=20,
+                max_connections=20,
+                keepalive_expiry=60.0,
+            ),
+        )
+        atexit.register(self._http.close)
+        # notion-sdk-py overwrites the httpx timeout, so configure it here
+        return Client(auth=self.notion_token, client=self._http, timeout_ms=30_000)
 
-        Returns:
-            bool: True if the plugin can handle the on_response method."""
-        return False
+    can_handle_on_response = _ignores
 
     def on_response(self, response: str, *args, **kwargs) -> str:
         """This method is called when a response is received from the model."""
         pass
 
-    def can_handle_post_prompt(self) -> bool:
-        """This method is called to check that the plugin can
-        handle the post_prompt method.
-
-        Returns:
-            bool: True if the plugin can handle the post_prompt method."""
-        return True
+    can_handle_post_prompt = _handles
 
     def post_prompt(self, prompt: PromptGenerator) -> PromptGenerator:
         """This method is called just after the generate_prompt is called,
@@ -62,64 +105,12 @@ class AutoGPTNotion(AutoGPTPluginTemplate):
         Returns:
             PromptGenerator: The prompt generator.
         """
-        from .notion import (
-            append_page,
-            create_page,
-            get_all_pages,
-            retrieve_page,
-            update_page_properties,
-        )
-
-        prompt.add_command(
-            "notion_create_page",
-            "Create a new Notion page",
-            {
-                "title": "<title>",
-                "summary": "<summary>",
-                "tags": "<list_of_tags>",
-                "content": "<content>",
-            },
-            create_page,
-        )
-        prompt.add_command(
-            "notion_get_all_pages",
-            "Retrieves all pages properties from a database",
-            {},
-            get_all_pages,
-        )
-        prompt.add_command(
-            "notion_append_page",
-            "Append page content by id",
-            {"page_id": "<page_id>", "content": "<content>"},
-            append_page,
-        )
-        prompt.add_command(
-            "notion_retrieve_page",
-            "Retrieves a page's properties and content by id",
-            {"page_id": "<page_id>"},
-            retrieve_page,
-        )
-        prompt.add_command(
-            "notion_update_page_properties",
-            "Update a page's properties by id",
-            {
-                "page_id": "<page_id>",
-                "title": "<title>",
-                "summary": "<summary>",
-                "tags": "<list_of_tags>",
-            },
-            update_page_properties,
-        )
+        for label, name, args, function in _COMMANDS:
+            prompt.add_command(label, name, args, function)
 
         return prompt
 
-    def can_handle_on_planning(self) -> bool:
-        """This method is called to check that the plugin can
-        handle the on_planning method.
-
-        Returns:
-            bool: True if the plugin can handle the on_planning method."""
-        return False
+    can_handle_on_planning = _ignores
 
     def on_planning(
         self, prompt: PromptGenerator, messages: List[Message]
@@ -132,13 +123,7 @@ class AutoGPTNotion(AutoGPTPluginTemplate):
         """
         pass
 
-    def can_handle_post_planning(self) -> bool:
-        """This method is called to check that the plugin can
-        handle the post_planning method.
-
-        Returns:
-            bool: True if the plugin can handle the post_planning method."""
-        return False
+    can_handle_post_planning = _ignores
 
     def post_planning(self, response: str) -> str:
         """This method is called after the planning chat completion is done.
@@ -151,13 +136,7 @@ class AutoGPTNotion(AutoGPTPluginTemplate):
         """
         pass
 
-    def can_handle_pre_instruction(self) -> bool:
-        """This method is called to check that the plugin can
-        handle the pre_instruction method.
-
-        Returns:
-            bool: True if the plugin can handle the pre_instruction method."""
-        return False
+    can_handle_pre_instruction = _ignores
 
     def pre_instruction(self, messages: List[Message]) -> List[Message]:
         """This method is called before the instruction chat is done.
@@ -170,13 +149,7 @@ class AutoGPTNotion(AutoGPTPluginTemplate):
         """
         pass
 
-    def can_handle_on_instruction(self) -> bool:
-        """This method is called to check that the plugin can
-        handle the on_instruction method.
-
-        Returns:
-            bool: True if the plugin can handle the on_instruction method."""
-        return False
+    can_handle_on_instruction = _ignores
 
     def on_instruction(self, messages: List[Message]) -> Optional[str]:
         """This method is called when the instruction chat is done.
@@ -189,13 +162,7 @@ class AutoGPTNotion(AutoGPTPluginTemplate):
         """
         pass
 
-    def can_handle_post_instruction(self) -> bool:
-        """This method is called to check that the plugin can
-        handle the post_instruction method.
-
-        Returns:
-            bool: True if the plugin can handle the post_instruction method."""
-        return False
+    can_handle_post_instruction = _ignores
 
     def post_instruction(self, response: str) -> str:
         """This method is called after the instruction chat is done.
@@ -208,13 +175,7 @@ class AutoGPTNotion(AutoGPTPluginTemplate):
         """
         pass
 
-    def can_handle_pre_command(self) -> bool:
-        """This method is called to check that the plugin can
-        handle the pre_command method.
-
-        Returns:
-            bool: True if the plugin can handle the pre_command method."""
-        return False
+    can_handle_pre_command = _ignores
 
     def pre_command(
         self, command_name: str, arguments: Dict[str, Any]
@@ -230,13 +191,7 @@ class AutoGPTNotion(AutoGPTPluginTemplate):
         """
         pass
 
-    def can_handle_post_command(self) -> bool:
-        """This method is called to check that the plugin can
-        handle the post_command method.
-
-        Returns:
-            bool: True if the plugin can handle the post_command method."""
-        return False
+    can_handle_post_command = _ignores
 
     def post_command(self, command_name: str, response: str) -> str:
         """This method is called after the command is executed.
@@ -250,21 +205,7 @@ class AutoGPTNotion(AutoGPTPluginTemplate):
         """
         pass
 
-    def can_handle_chat_completion(
-        self, messages: Dict[Any, Any], model: str, temperature: float, max_tokens: int
-    ) -> bool:
-        """This method is called to check that the plugin can
-          handle the chat_completion method.
-
-        Args:
-            messages (List[Message]): The messages.
-            model (str): The model name.
-            temperature (float): The temperature.
-            max_tokens (int): The max tokens.
-
-          Returns:
-              bool: True if the plugin can handle the chat_completion method."""
-        return False
+    can_handle_chat_completion = _ignores
 
     def handle_chat_completion(
         self, messages: List[Message], model: str, temperature: float, max_tokens: int
@@ -282,24 +223,77 @@ class AutoGPTNotion(AutoGPTPluginTemplate):
         """
         pass
     
-    def can_handle_text_embedding(
-        self, text: str
-    ) -> bool:
-        return False
+    can_handle_text_embedding = _ignores
     
     def handle_text_embedding(
         self, text: str
     ) -> list:
         pass
 
-    def can_handle_user_input(self, user_input: str) -> bool:
-        return False
+    can_handle_user_input = _ignores
 
     def user_input(self, user_input: str) -> str:
         return user_input
 
-    def can_handle_report(self) -> bool:
-        return False
+    can_handle_report = _ignores
 
     def report(self, message: str) -> None:
-        pass
\ No newline at end of file
+        pass
+
+
+# Imported after the class because .notion instantiates AutoGPTNotion on import
+from .notion import (  # noqa: E402
+    append_page,
+    create_page,
+    get_all_pages,
+    retrieve_page,
+    update_page_properties,
+)
+
+# Built once; the argument specs are read-only since every prompt shares them
+_COMMANDS = (
+    (
+        "notion_create_page",
+        "Create a new Notion page",
+        MappingProxyType(
+            {
+                "title": "<title>",
+                "summary": "<summary>",
+                "tags": "<list_of_tags>",
+                "content": "<content>",
+            }
+        ),
+        create_page,
+    ),
+    (
+        "notion_get_all_pages",
+        "Retrieves all pages properties from a database",
+        MappingProxyType({}),
+        get_all_pages,
+    ),
+    (
+        "notion_append_page",
+        "Append page content by id",
+        MappingProxyType({"page_id": "<page_id>", "content": "<content>"}),
+        append_page,
+    ),
+    (
+        "notion_retrieve_page",
+        "Retrieves a page's properties and content by id",
+        MappingProxyType({"page_id": "<page_id>"}),
+        retrieve_page,
+    ),
+    (
+        "notion_update_page_properties",
+        "Update a page's properties by id",
+        MappingProxyType(
+            {
+                "page_id": "<page_id>",
+                "title": "<title>",
+                "summary": "<summary>",
+                "tags": "<list_of_tags>",
+            }
+        ),
+        update_page_properties,
+    ),
+)
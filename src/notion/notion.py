@@ -1,8 +1,12 @@
+from notion_client.helpers import iterate_paginated_api
+
 from . import AutoGPTNotion
+from .utils import retry_on_rate_limit, swr_cache
 
 plugin = AutoGPTNotion()
 
 
+@retry_on_rate_limit()
 def create_page(title, summary, tags, content):
     """
     Creates a new Notion page
@@ -39,15 +43,20 @@ def create_page(title, summary, tags, content):
     page = plugin.notion.pages.create(
         parent=parent, properties=properties, children=children
     )
+    get_all_pages.cache_clear()
     return f"""Create Notion page successfully!
         link: {page.get('url')}
         page_id: {page.get('id')}"""
 
 
+@swr_cache(max_age=30, stale_max_age=300)
 def get_all_pages():
     """
     Retrieves all pages properties from a database
 
+    Results are cached since the agent tends to list the database repeatedly;
+    creating or updating a page through this plugin clears the cache.
+
     Returns:
     - A list of dictionaries, each dictionary has the following keys:
         - id: The ID of the page in the database.
@@ -58,12 +67,14 @@ def get_all_pages():
     # Get the database ID from the plugin object
     database_id = plugin.database_id
 
-    # Query the database using the Notion API to get all pages
-    pages = plugin.notion.databases.query(
-        **{
-            "database_id": database_id,
-        }
-    ).get("results")
+    # Query the database using the Notion API to get all pages, following
+    # next_cursor since each response holds at most 100 of them. Each page
+    # request is retried on its own so a 429 doesn't restart the walk.
+    pages = iterate_paginated_api(
+        retry_on_rate_limit()(plugin.notion.databases.query),
+        database_id=database_id,
+        page_size=100,
+    )
 
     # Initialize an empty list to store information about each page
     page_info = []
@@ -105,6 +116,7 @@ def get_all_pages():
     return page_info
 
 
+@retry_on_rate_limit()
 def update_page_properties(page_id, title, summary, tags):
     """
     Update page properties by id
@@ -115,9 +127,11 @@ def update_page_properties(page_id, title, summary, tags):
         "Tags": {"multi_select": [{"name": tag} for tag in tags]},
     }
     page = plugin.notion.pages.update(page_id=page_id, properties=properties)
+    get_all_pages.cache_clear()
     return f"Update Notion page successfully! {page.get('url')}"
 
 
+@retry_on_rate_limit()
 def append_page(page_id, content):
     """
     Append page content by id
@@ -138,6 +152,7 @@ def append_page(page_id, content):
     return f"Append Notion page successfully! {page.get('url')}"
 
 
+@retry_on_rate_limit()
 def retrieve_page(page_id):
     """
     Retrieve page properties and content by id
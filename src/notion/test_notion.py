@@ -1,10 +1,18 @@
 import datetime
+import json
+import logging
 from pprint import pprint
 
+import httpx
+from abstract_singleton import Singleton
+from notion_client import Client
+
+from . import AutoGPTNotion
 from .notion import (
     append_page,
     create_page,
     get_all_pages,
+    plugin,
     retrieve_page,
     update_page_properties,
 )
@@ -79,3 +87,75 @@ def test_update_page_properties():
             tags=["test", "test-updated"],
         )
     )
+
+
+# Unit tests
+
+
+def database_row(page_id, title):
+    return {
+        "id": page_id,
+        "properties": {
+            "Title": {"title": [{"text": {"content": title}}]},
+            "Summary": {"rich_text": [{"text": {"content": "summary"}}]},
+            "Tags": {"multi_select": [{"name": "test"}]},
+        },
+    }
+
+
+def test_get_all_pages_follows_cursor(monkeypatch):
+    responses = [
+        {"results": [database_row("1", "one")], "has_more": True, "next_cursor": "c"},
+        {"results": [database_row("2", "two")], "has_more": False, "next_cursor": None},
+    ]
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json=responses[len(requests) - 1])
+
+    http = httpx.Client(transport=httpx.MockTransport(handler))
+    monkeypatch.setitem(vars(plugin), "notion", Client(auth="secret", client=http))
+    monkeypatch.setitem(vars(plugin), "database_id", "database")
+    get_all_pages.cache_clear()
+    try:
+        pages = get_all_pages()
+    finally:
+        get_all_pages.cache_clear()
+
+    assert [(page["id"], page["title"]) for page in pages] == [
+        ("1", "one"),
+        ("2", "two"),
+    ]
+    assert len(requests) == 2
+    assert all(
+        request.url.path.endswith("/databases/database/query") for request in requests
+    )
+    bodies = [json.loads(request.content) for request in requests]
+    assert bodies[0].get("start_cursor") is None
+    assert bodies[0]["page_size"] == 100
+    assert bodies[1]["start_cursor"] == "c"
+
+
+def new_plugin(monkeypatch):
+    """Build a fresh plugin instead of the shared singleton"""
+    monkeypatch.setattr(Singleton, "_instances", {})
+    return AutoGPTNotion()
+
+
+def test_plugin_disabled_without_credentials(monkeypatch, tmp_path, caplog):
+    # No .env in the working directory and nothing in the environment
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("NOTION_TOKEN", raising=False)
+    monkeypatch.delenv("NOTION_DATABASE_ID", raising=False)
+    with caplog.at_level(logging.WARNING):
+        disabled = new_plugin(monkeypatch)
+    assert not disabled.can_handle_post_prompt()
+    assert "the Notion plugin is disabled" in caplog.text
+    assert "notion" not in vars(disabled)
+
+    monkeypatch.setenv("NOTION_TOKEN", "secret")
+    monkeypatch.setenv("NOTION_DATABASE_ID", "database")
+    enabled = new_plugin(monkeypatch)
+    assert enabled.can_handle_post_prompt()
+    assert "notion" not in vars(enabled)
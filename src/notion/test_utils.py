@@ -0,0 +1,121 @@
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import httpx
+import pytest
+from notion_client import APIErrorCode, APIResponseError, Client
+
+from .utils import retry_on_rate_limit, swr_cache
+
+
+def make_client(*responses):
+    """A Notion client answering each request with the next of responses,
+    repeating the last one, and the list of requests it received"""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        status, body, headers = responses[min(len(requests), len(responses)) - 1]
+        return httpx.Response(status, json=body, headers=headers)
+
+    http = httpx.Client(transport=httpx.MockTransport(handler))
+    return Client(auth="secret", client=http), requests
+
+
+def api_error(status, code, headers=None):
+    body = {"object": "error", "status": status, "code": code, "message": code}
+    return status, body, headers or {}
+
+
+PAGE = (200, {"object": "page", "id": "page"}, {})
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+    monkeypatch.setattr(time, "sleep", delays.append)
+    return delays
+
+
+def test_retry_on_rate_limit_retries_until_success(sleeps):
+    rate_limited = api_error(429, "rate_limited", {"Retry-After": "2"})
+    client, requests = make_client(rate_limited, rate_limited, PAGE)
+    retrieve = retry_on_rate_limit(tries=5)(client.pages.retrieve)
+    assert retrieve(page_id="page")["id"] == "page"
+    assert len(requests) == 3
+    assert len(sleeps) == 2
+    assert all(2 <= delay < 2.25 for delay in sleeps)
+
+
+def test_retry_on_rate_limit_gives_up(sleeps):
+    client, requests = make_client(api_error(429, "rate_limited"))
+    retrieve = retry_on_rate_limit(tries=3)(client.pages.retrieve)
+    with pytest.raises(APIResponseError) as error:
+        retrieve(page_id="page")
+    assert error.value.code == APIErrorCode.RateLimited
+    assert len(requests) == 3
+    # Without Retry-After the delay backs off exponentially
+    assert [int(delay) for delay in sleeps] == [1, 2]
+
+
+def test_retry_on_rate_limit_reraises_other_errors(sleeps):
+    client, requests = make_client(api_error(404, "object_not_found"), PAGE)
+    retrieve = retry_on_rate_limit(tries=5)(client.pages.retrieve)
+    with pytest.raises(APIResponseError) as error:
+        retrieve(page_id="page")
+    assert error.value.code == APIErrorCode.ObjectNotFound
+    assert len(requests) == 1
+    assert sleeps == []
+
+
+def test_retry_on_rate_limit_accepts_http_date(sleeps):
+    retry_date = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30))
+    rate_limited = api_error(429, "rate_limited", {"Retry-After": retry_date})
+    client, requests = make_client(rate_limited, PAGE)
+    retrieve = retry_on_rate_limit(tries=5)(client.pages.retrieve)
+    assert retrieve(page_id="page")["id"] == "page"
+    assert len(requests) == 2
+    assert 25 < sleeps[0] <= 30.25
+
+
+def make_counter(**cache_kwargs):
+    calls = []
+
+    @swr_cache(**cache_kwargs)
+    def counter():
+        calls.append(None)
+        return len(calls)
+
+    return counter, calls
+
+
+def test_swr_cache_serves_fresh_result():
+    counter, calls = make_counter(max_age=60, stale_max_age=120)
+    assert counter() == 1
+    assert counter() == 1
+    assert len(calls) == 1
+
+
+def test_swr_cache_serves_stale_result_while_refreshing():
+    counter, calls = make_counter(max_age=0, stale_max_age=60)
+    assert counter() == 1
+    # The stale value is returned at once and refreshed in the background
+    assert counter() == 1
+    deadline = time.monotonic() + 5
+    while counter() == 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(calls) >= 2
+
+
+def test_swr_cache_recomputes_expired_result():
+    counter, calls = make_counter(max_age=0, stale_max_age=0)
+    assert counter() == 1
+    assert counter() == 2
+
+
+def test_swr_cache_clear():
+    counter, calls = make_counter(max_age=60, stale_max_age=120)
+    assert counter() == 1
+    counter.cache_clear()
+    assert counter() == 2
@@ -0,0 +1,131 @@
+"""Helpers wrapped around the Notion commands"""
+import functools
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from notion_client import APIErrorCode, APIResponseError
+
+
+def _retry_after(headers, attempt):
+    """Seconds to wait before the next attempt, from a Retry-After header
+    holding either seconds or an HTTP-date, else an exponential backoff"""
+    value = headers.get("Retry-After")
+    if value:
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+        try:
+            retry_date = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            pass
+        else:
+            if retry_date.tzinfo is None:
+                retry_date = retry_date.replace(tzinfo=timezone.utc)
+            return max((retry_date - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    return float(2**attempt)
+
+
+def retry_on_rate_limit(tries=5):
+    """
+    Retry a Notion call when the API answers 429 rate_limited
+
+    Parameters:
+        - tries: The number of attempts before the error is raised.
+
+    Returns:
+        - A decorator. Between attempts it sleeps for the Retry-After header, or
+            an exponential backoff when the header is missing, plus some jitter.
+            The whole function runs again, so any call it made before the one
+            that was rate limited must be safe to repeat, like a read.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            for attempt in range(tries):
+                try:
+                    return func(*args, **kwargs)
+                except APIResponseError as error:
+                    if error.code != APIErrorCode.RateLimited or attempt == tries - 1:
+                        raise
+                    delay = _retry_after(error.headers, attempt)
+                    time.sleep(delay + random.random() * 0.25)
+
+        return wrapper
+
+    return decorator
+
+
+def swr_cache(max_age, stale_max_age):
+    """
+    Cache results with a stale-while-revalidate policy
+
+    Parameters:
+        - max_age: Seconds a result is served without being refreshed.
+        - stale_max_age: Seconds a result may still be served while a background
+            thread refreshes it. Older results are recomputed before returning.
+
+    Returns:
+        - A decorator. The wrapped function gains a cache_clear() method to drop
+            every cached result, e.g. after a write makes them outdated.
+    """
+
+    def decorator(func):
+        # key -> [timestamp, value, refreshing]
+        entries = {}
+        lock = threading.Lock()
+        # Bumped by cache_clear() so in-flight refreshes don't store old data
+        generation = [0]
+
+        def store(key, value, started_generation):
+            with lock:
+                if generation[0] == started_generation:
+                    entries[key] = [time.monotonic(), value, False]
+
+        def refresh(key, args, kwargs, started_generation):
+            try:
+                value = func(*args, **kwargs)
+            except Exception:
+                # Keep serving the stale value; the next call tries again
+                with lock:
+                    if key in entries:
+                        entries[key][2] = False
+                return
+            store(key, value, started_generation)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            with lock:
+                entry = entries.get(key)
+                started_generation = generation[0]
+                if entry is not None:
+                    age = time.monotonic() - entry[0]
+                    if age < max_age:
+                        return entry[1]
+                    if age < stale_max_age:
+                        if not entry[2]:
+                            entry[2] = True
+                            threading.Thread(
+                                target=refresh,
+                                args=(key, args, kwargs, started_generation),
+                                daemon=True,
+                            ).start()
+                        return entry[1]
+            value = func(*args, **kwargs)
+            store(key, value, started_generation)
+            return value
+
+        def cache_clear():
+            with lock:
+                entries.clear()
+                generation[0] += 1
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+
+    return decorator